@@ -1,30 +1,53 @@
 import os
+import re
+import heapq
+import asyncio
+import queue
 import logging
+import logging.handlers
+import threading
+import weakref
 from datetime import datetime, timedelta, timezone
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from dotenv import load_dotenv
 
 # ---------- Firebase ----------
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
+from google.cloud.firestore_v1.base_query import FieldFilter
+from google.cloud.firestore_v1.watch import ChangeType
 
 # ---------- Google Calendar ----------
-from google.oauth2.service_account import Credentials as SACredentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.http import build_http
 from googleapiclient.errors import HttpError
 
 # ================== CONFIG ==================
-# How often to run the "extend events" loop
-EXTEND_LOOP_SECONDS = 60
+# Sessions coming due within this window are extended in the same batch;
+# also the retry delay after a failed extension
+EXTEND_SLACK = timedelta(seconds=60)
 # Keep each active event at least this far into the future
 ROLLING_HORIZON = timedelta(minutes=15)
 # Only patch if fewer than this many minutes remain (reduces API calls)
 TOP_UP_THRESHOLD = timedelta(minutes=10)
+# Google's batch endpoint accepts at most this many sub-requests per call
+GCAL_BATCH_SIZE = 50
+# Firestore WriteBatch limit
+FIRESTORE_BATCH_SIZE = 500
 # Use UTC for simplicity; Calendar gets explicit timeZone = "UTC"
 GCAL_TIMEZONE = "UTC"
 PLACES = {"ieee", "mcgill", "ev", "home"}
+_PLACES_PROMPT = ", ".join(sorted(PLACES))
+_INVALID_PLACE_MSG = "Invalid location! Options: " + _PLACES_PROMPT
+# Whole-word match so e.g. "ev" doesn't match inside "event"
+_PLACE_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, sorted(PLACES, key=len, reverse=True))) + r")\b"
+)
+# How many of a user's active sessions to fetch when resolving start/stop
+USER_ACTIVE_LIMIT = 5
 
 # ================== INIT ====================
 load_dotenv()
@@ -37,24 +60,58 @@ SA_PATH = os.getenv("SA_PATH", "/app/serviceAccounts.json")
 # firebase
 cred = credentials.Certificate(SA_PATH)
 firebase_admin.initialize_app(cred)
-db = firestore.client()
+db = firestore_async.client()
 events_ref = db.collection("events")
+# on_snapshot is only available on the sync client; used for the listener alone
+_watch_events_ref = firestore.client().collection("events")
 
 # Discord
-handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
+# Handlers only enqueue; the listener thread does the actual file writes so
+# logging never blocks the event loop on disk I/O
+_log_queue = queue.SimpleQueue()
+handler = logging.handlers.QueueHandler(_log_queue)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.handlers.RotatingFileHandler(
+        filename='discord.log', encoding='utf-8', maxBytes=10_000_000, backupCount=3
+    ),
+)
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Messages that can possibly be a command: anything '!'-prefixed, or bare start/stop
+_COMMAND_STARTS = ("!", "start", "stop")
+# Commands work both bare ("start ev") and prefixed ("!start ev"); the empty
+# prefix has to come last since prefixes are tried in order
+bot = commands.Bot(command_prefix=['!', ''], case_insensitive=True, intents=intents)
 
-# Google Calendar service account creds
+# Google Calendar service account creds (same key Firebase Admin loaded)
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
-sa_creds = SACredentials.from_service_account_file(SA_PATH, scopes=SCOPES)
+sa_creds = cred.get_credential().with_scopes(SCOPES)
+
+_gcal_service = None
+_gcal_http = threading.local()
+
+def gcal_http():
+    # httplib2.Http isn't thread-safe, so each executor thread keeps its own
+    # authorized keep-alive connection and reuses it across calls
+    http = getattr(_gcal_http, "http", None)
+    if http is None:
+        # build_http() keeps googleapiclient's socket timeout and redirect handling
+        http = _gcal_http.http = AuthorizedHttp(sa_creds, http=build_http())
+    return http
 
 def gcal():
     # Note: no domain-wide delegation needed because the target calendar
     # is explicitly shared with this service account.
-    return build("calendar", "v3", credentials=sa_creds, cache_discovery=False)
+    # Built once and reused; static discovery avoids fetching the API doc.
+    global _gcal_service
+    if _gcal_service is None:
+        _gcal_service = build(
+            "calendar", "v3", http=gcal_http(),
+            cache_discovery=False, static_discovery=True
+        )
+    return _gcal_service
 
 def now_utc():
     return datetime.now(timezone.utc)
@@ -63,10 +120,12 @@ def to_rfc3339(dt: datetime) -> str:
     # Google API expects RFC3339; ensure tz aware and format with 'Z'
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+    else:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
 
 # ------------- Calendar helpers -------------
-def insert_calendar_event(summary: str, start_dt: datetime, end_dt: datetime, location_text: str = None) -> str:
+async def insert_calendar_event(summary: str, start_dt: datetime, end_dt: datetime, location_text: str = None) -> str:
     """Insert event and return its eventId."""
     service = gcal()
     body = {
@@ -76,25 +135,180 @@ def insert_calendar_event(summary: str, start_dt: datetime, end_dt: datetime, lo
         "end":   {"dateTime": to_rfc3339(end_dt),   "timeZone": GCAL_TIMEZONE},
         "description": "Auto-created by Discord work-session bot",
     }
-    created = service.events().insert(calendarId=CALENDAR_ID, body=body).execute()
+    created = await asyncio.to_thread(
+        lambda: service.events().insert(calendarId=CALENDAR_ID, body=body).execute(http=gcal_http())
+    )
     return created["id"]
 
-def patch_calendar_event_end(event_id: str, new_end: datetime):
+async def patch_calendar_event_end(event_id: str, new_end: datetime):
     """Patch only the end time of an event."""
     service = gcal()
     body = {
         "end": {"dateTime": to_rfc3339(new_end), "timeZone": GCAL_TIMEZONE}
     }
-    service.events().patch(calendarId=CALENDAR_ID, eventId=event_id, body=body).execute()
+    await asyncio.to_thread(
+        lambda: service.events().patch(calendarId=CALENDAR_ID, eventId=event_id, body=body).execute(http=gcal_http())
+    )
+
+async def batch_patch_calendar_event_ends(updates, callback):
+    """Patch many event end times using batch HTTP requests.
+
+    `updates` is a list of (request_id, event_id, new_end); `callback` is
+    called as callback(request_id, response, exception) for each one, from
+    the worker thread that executes the batch.
+    """
+    service = gcal()
+    for i in range(0, len(updates), GCAL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=callback)
+        for request_id, event_id, new_end in updates[i:i + GCAL_BATCH_SIZE]:
+            body = {
+                "end": {"dateTime": to_rfc3339(new_end), "timeZone": GCAL_TIMEZONE}
+            }
+            batch.add(
+                service.events().patch(calendarId=CALENDAR_ID, eventId=event_id, body=body),
+                request_id=request_id,
+            )
+        await asyncio.to_thread(lambda: batch.execute(http=gcal_http()))
+
+# ------------- Active session cache -------------
+# doc_id -> (calendar_event_id, calendar_end as datetime or None) for every
+# session with no end_time, kept current by a Firestore snapshot listener so the extend
+# loop never has to query the collection.
+active_sessions = {}
+# user_id -> {guild_id: doc_id}, so start can reject double-starts without a read
+active_by_user = {}
+# doc_id -> (user_id, guild_id), to unindex a session once it's gone
+_active_owner = {}
+# Sessions this process has stopped but whose REMOVED change hasn't arrived;
+# older snapshots of them must not put them back into the cache
+_stopped_ids = set()
+_active_synced = False  # True once the listener delivered its first snapshot
+_active_watch = None
+_loop = None
+# min-heap of (due_at, doc_id) where due_at = calendar_end - TOP_UP_THRESHOLD;
+# entries are never removed in place, stale ones are skipped when popped
+_extend_heap = []
+_extend_wakeup = asyncio.Event()
+# doc_id -> Event set once the extension batch carrying it has fully landed
+_extend_in_flight = {}
+
+def _extend_due_at(calendar_end, now):
+    if not isinstance(calendar_end, datetime):
+        calendar_end = now  # be safe
+    return calendar_end - TOP_UP_THRESHOLD
+
+def _schedule_extend(doc_id, calendar_end):
+    heapq.heappush(_extend_heap, (_extend_due_at(calendar_end, now_utc()), doc_id))
+    _extend_wakeup.set()
+    _ensure_extender()
+
+def _remember_session(doc_id, user_id, guild_id, event_id, calendar_end):
+    if not isinstance(calendar_end, datetime):
+        calendar_end = None
+    entry = (event_id, calendar_end)
+    changed = active_sessions.get(doc_id) != entry
+    active_sessions[doc_id] = entry
+    _active_owner[doc_id] = (user_id, guild_id)
+    active_by_user.setdefault(user_id, {})[guild_id] = doc_id
+    # The listener echoes our own extensions back; only reschedule real changes
+    if event_id and changed:
+        _schedule_extend(doc_id, calendar_end)
+
+def _snapshot_field(doc, field):
+    # DocumentSnapshot.get copies just this value (to_dict deep-copies the
+    # whole document) but raises on missing fields
+    try:
+        return doc.get(field)
+    except KeyError:
+        return None
+
+def _forget_session(doc_id):
+    active_sessions.pop(doc_id, None)
+    owner = _active_owner.pop(doc_id, None)
+    if owner is None:
+        return
+    user_id, guild_id = owner
+    sessions = active_by_user.get(user_id)
+    if sessions and sessions.get(guild_id) == doc_id:
+        del sessions[guild_id]
+        if not sessions:
+            del active_by_user[user_id]
+
+def _apply_active_changes(changes):
+    global _active_synced
+    for change in changes:
+        doc = change.document
+        if change.type == ChangeType.REMOVED:
+            _stopped_ids.discard(doc.id)
+            _forget_session(doc.id)
+        elif doc.id in _stopped_ids:
+            continue  # snapshot predates our end_time write
+        else:
+            _remember_session(
+                doc.id,
+                _snapshot_field(doc, "user_id"),
+                _snapshot_field(doc, "guild_id"),
+                _snapshot_field(doc, "calendar_event_id"),
+                _snapshot_field(doc, "calendar_end"),
+            )
+    _active_synced = True
+
+def _on_active_snapshot(docs, changes, read_time):
+    # Runs on the listener's thread; apply changes on the event loop instead
+    _loop.call_soon_threadsafe(_apply_active_changes, changes)
+
+def watch_active_sessions():
+    """Start the active-session listener once (on_ready can fire on every reconnect)."""
+    global _active_watch, _loop
+    if _active_watch is not None:
+        return
+    _loop = asyncio.get_running_loop()
+    _active_watch = _watch_events_ref.where(
+        filter=FieldFilter("end_time", "==", None)
+    ).on_snapshot(_on_active_snapshot)
 
 # ------------- Session helpers -------------
+def _user_active_query(user_id, fields):
+    # Newest-first; served by the (user_id, end_time, start_time desc)
+    # composite index in firestore.indexes.json. Only `fields` are returned.
+    return (
+        events_ref.where(filter=FieldFilter("user_id", "==", user_id))
+        .where(filter=FieldFilter("end_time", "==", None))
+        .order_by("start_time", direction=firestore.Query.DESCENDING)
+        .select(fields)
+        .limit(USER_ACTIVE_LIMIT)
+    )
+
+# user_id -> Lock serializing that user's start/stop; entries go away once unused
+_user_locks = weakref.WeakValueDictionary()
+
+def _user_lock(user_id):
+    lock = _user_locks.get(user_id)
+    if lock is None:
+        lock = _user_locks[user_id] = asyncio.Lock()
+    return lock
+
 async def create_event(user, location, guild_id):
     """Create a new active event if none exists + create Google Calendar event."""
+    # Held across the Calendar/Firestore round-trips so a double-sent 'start'
+    # can't pass the duplicate check before the first one is recorded
+    async with _user_lock(user.id):
+        return await _create_event(user, location, guild_id)
+
+async def _create_event(user, location, guild_id):
     # Guard: no double-starts per guild (or across guilds if guild_id is None)
-    q = events_ref.where("user_id", "==", user.id).where("end_time", "==", None)
-    if guild_id is not None:
-        q = q.where("guild_id", "==", guild_id)
-    if list(q.limit(1).stream()):
+    if _active_synced:
+        sessions = active_by_user.get(user.id, {})
+        conflict = bool(sessions) if guild_id is None else guild_id in sessions
+    else:
+        # listener hasn't caught up yet (just after startup), ask Firestore
+        q = _user_active_query(user.id, ["guild_id"])
+        conflict = False
+        async for doc in q.stream():
+            if guild_id is None or doc.get("guild_id") == guild_id:
+                conflict = True
+                break
+    if conflict:
         return None, "You already have an active event. Send 'stop' first.'"
 
     start_dt = now_utc()
@@ -105,7 +319,7 @@ async def create_event(user, location, guild_id):
 
     # Create calendar event
     try:
-        event_id = insert_calendar_event(summary, start_dt, initial_end, location_text=location)
+        event_id = await insert_calendar_event(summary, start_dt, initial_end, location_text=location)
     except HttpError as e:
         logging.exception("Failed to insert calendar event")
         return None, f"Couldn't create Google Calendar event ({e}). Try again."
@@ -125,45 +339,61 @@ async def create_event(user, location, guild_id):
         "last_extend_check": start_dt
     }
     doc_ref = events_ref.document()
-    doc_ref.set(doc_data)
+    await doc_ref.set(doc_data)
+    # Record it before releasing the user lock; the listener may lag behind
+    _remember_session(doc_ref.id, user.id, guild_id, event_id, initial_end)
     return doc_ref.id, None
 
 async def stop_event(user, guild_id):
     """Stop the newest active event for the user, patching Calendar to exact stop time."""
+    # Same lock as create_event, so a stop right after a start sees that session
+    async with _user_lock(user.id):
+        return await _stop_event(user, guild_id)
+
+async def _stop_event(user, guild_id):
     try:
-        q = events_ref.where("user_id", "==", user.id).where("end_time", "==", None)
-        if guild_id is not None:
-            q = q.where("guild_id", "==", guild_id)
-        snap = list(q.stream())
-        if not snap and guild_id is not None:
-            # cross-guild fallback if stopped in DM or different server
-            snap = list(events_ref.where("user_id", "==", user.id).where("end_time", "==", None).stream())
+        q = _user_active_query(user.id, ["start_time", "calendar_event_id", "guild_id"])
+        snap = [doc async for doc in q.stream()]
         if not snap:
             return None, "You have no active event to stop."
 
-        # pick the most recent by start_time
-        def _get_start(doc):
-            data = doc.to_dict()
-            return data.get("start_time") or datetime.min.replace(tzinfo=timezone.utc)
-        doc = max(snap, key=_get_start)
-        data = doc.to_dict()
-
+        # newest session in this guild, else the newest anywhere (cross-guild
+        # fallback if stopped in DM or a different server)
+        doc = snap[0]
+        if guild_id is not None:
+            doc = next((d for d in snap if d.get("guild_id") == guild_id), doc)
+        event_id = doc.get("calendar_event_id")
+
+        # Let an in-flight extension land first so it can't push Calendar or
+        # calendar_end back past our stop time, then drop the session from the
+        # cache (no awaits in between) so the extender won't pick it up again
+        while doc.id in _extend_in_flight:
+            await _extend_in_flight[doc.id].wait()
+        cached = active_sessions.get(doc.id)
+        _stopped_ids.add(doc.id)
+        _forget_session(doc.id)
         stop_ts = now_utc()
-        event_id = data.get("calendar_event_id")
 
-        # Patch calendar first so UI is correct even if Firestore update races
-        if event_id:
-            try:
-                patch_calendar_event_end(event_id, stop_ts)
-            except HttpError:
-                logging.exception("Failed to patch calendar event end on stop")
-
-        # Mark Firestore ended
-        doc.reference.update({
-            "end_time": firestore.SERVER_TIMESTAMP,
-            "calendar_end": stop_ts,
-            "last_extend_check": stop_ts
-        })
+        try:
+            # Patch calendar first so UI is correct even if Firestore update races
+            if event_id:
+                try:
+                    await patch_calendar_event_end(event_id, stop_ts)
+                except HttpError:
+                    logging.exception("Failed to patch calendar event end on stop")
+
+            # Mark Firestore ended
+            await doc.reference.update({
+                "end_time": firestore.SERVER_TIMESTAMP,
+                "calendar_end": stop_ts,
+                "last_extend_check": stop_ts
+            })
+        except Exception:
+            # Still active in Firestore; keep extending it
+            _stopped_ids.discard(doc.id)
+            if cached is not None:
+                _remember_session(doc.id, user.id, doc.get("guild_id"), *cached)
+            raise
         return doc.id, None
 
     except Exception:
@@ -171,102 +401,189 @@ async def stop_event(user, guild_id):
         return None, "Sorry, something went wrong stopping your event."
 
 # ------------- Background extender -------------
-@tasks.loop(seconds=EXTEND_LOOP_SECONDS)
-async def extend_active_events():
-    """Every minute: look at all active sessions and top-up their end to now+15m if needed."""
+_extend_task = None
+
+def _ensure_extender():
+    # Started lazily by the first session that needs extending
+    global _extend_task
+    if _extend_task is None:
+        _extend_task = asyncio.create_task(extend_active_events())
+
+async def _extend_due_sessions():
+    """Top-up every session whose end is within TOP_UP_THRESHOLD (or soon will be) to ~now+15m."""
+    now = now_utc()
+    horizon = now + EXTEND_SLACK
+    # Floored to the minute, so the new end lands 14-15 minutes out and
+    # sessions extended within the same minute all share one value
+    new_end = (now + ROLLING_HORIZON).replace(second=0, microsecond=0)
+    due = {}
+    while _extend_heap and _extend_heap[0][0] <= horizon:
+        _, doc_id = heapq.heappop(_extend_heap)
+        cached = active_sessions.get(doc_id)
+        if cached is None or not cached[0]:
+            continue  # stopped since it was scheduled, or nothing to extend
+        # Stale entry: calendar_end moved on and a fresher entry is queued
+        if _extend_due_at(cached[1], now) > horizon:
+            continue
+        due[doc_id] = cached[0]
+
+    if not due:
+        return
+
+    done = asyncio.Event()
+    for doc_id in due:
+        _extend_in_flight[doc_id] = done
     try:
-        active = list(events_ref.where("end_time", "==", None).stream())
-        if not active:
-            return
-
-        now = now_utc()
-        for doc in active:
-            data = doc.to_dict()
-            event_id = data.get("calendar_event_id")
-            if not event_id:
-                continue  # nothing to extend
-
-            current_end = data.get("calendar_end")
-            if not isinstance(current_end, datetime):
-                current_end = now  # be safe
-
-            # If fewer than TOP_UP_THRESHOLD remain, extend to now + ROLLING_HORIZON
-            if current_end - now <= TOP_UP_THRESHOLD:
-                new_end = now + ROLLING_HORIZON
-                try:
-                    patch_calendar_event_end(event_id, new_end)
-                    # Update Firestore mirror
-                    doc.reference.update({
-                        "calendar_end": new_end,
-                        "last_extend_check": now
-                    })
-                except HttpError:
-                    logging.exception(f"Failed to extend calendar event {event_id}")
+        await _extend_sessions(due, now, new_end)
+    finally:
+        for doc_id in due:
+            _extend_in_flight.pop(doc_id, None)
+        done.set()
+
+async def _extend_sessions(due, now, new_end):
+    """Patch Calendar for `due` ({doc_id: event_id}), mirror to Firestore and reschedule."""
+    failed = set()
+
+    def _on_patched(request_id, response, exception):
+        event_id = due[request_id]
+        if exception is not None:
+            logging.error(f"Failed to extend calendar event {event_id}: {exception}")
+            failed.add(request_id)
 
+    try:
+        await batch_patch_calendar_event_ends(
+            [(doc_id, event_id, new_end) for doc_id, event_id in due.items()],
+            _on_patched,
+        )
     except Exception:
-        logging.exception("Error in extend_active_events loop")
+        # Transport/auth errors too: these docs are already off the heap, so
+        # anything not marked failed here would never be retried
+        logging.exception("Failed to extend calendar events")
+        failed.update(due)
+
+    # Update Firestore mirror for everything Calendar accepted; a session that
+    # left the cache meanwhile (stop waits for us, so only an outside stop)
+    # must not have calendar_end overwritten
+    patched = [doc_id for doc_id in due if doc_id not in failed and doc_id in active_sessions]
+    for i in range(0, len(patched), FIRESTORE_BATCH_SIZE):
+        wb = db.batch()
+        for doc_id in patched[i:i + FIRESTORE_BATCH_SIZE]:
+            wb.update(events_ref.document(doc_id), {
+                "calendar_end": new_end,
+                "last_extend_check": now
+            })
+        try:
+            await wb.commit()
+        except Exception:
+            logging.exception("Failed to record calendar extensions")
+
+    for doc_id, event_id in due.items():
+        if doc_id not in active_sessions:
+            continue  # stopped outside this bot while the batch was in flight
+        if doc_id in failed:
+            heapq.heappush(_extend_heap, (now + EXTEND_SLACK, doc_id))
+        else:
+            # Reschedule now rather than waiting for the listener to echo it
+            active_sessions[doc_id] = (event_id, new_end)
+            _schedule_extend(doc_id, new_end)
 
-@extend_active_events.before_loop
-async def _before_loop():
+async def extend_active_events():
+    """Sleep until the earliest active session is due for a top-up, then extend it."""
     await bot.wait_until_ready()
+    while True:
+        _extend_wakeup.clear()
+        delay = None
+        if not active_sessions:
+            # Nothing active: whatever is left in the heap is stale
+            _extend_heap.clear()
+        elif _extend_heap:
+            delay = (_extend_heap[0][0] - now_utc()).total_seconds()
+        if delay is None or delay > 0:
+            # A new or moved session may be due earlier than what we're waiting on
+            try:
+                await asyncio.wait_for(_extend_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        try:
+            await _extend_due_sessions()
+        except Exception:
+            logging.exception("Error in extend_active_events loop")
 
 # ------------- Discord events -------------
 @bot.event
 async def on_ready():
     print(f"We are ready to go in, {bot.user.name}")
-    if not extend_active_events.is_running():
-        extend_active_events.start()
+    watch_active_sessions()
 
 @bot.event
 async def on_message(message: discord.Message):
-    if message.author == bot.user:
+    # Cheap pre-filter so ordinary chat never reaches the command parser
+    if message.author.bot:
         return
+    if not message.content[:5].lower().startswith(_COMMAND_STARTS):
+        return
+    await bot.process_commands(message)
 
-    content = message.content.lower().strip()
-    guild_id = message.guild.id if message.guild else None
-
-    # START
-    if content.startswith("start"):
-        parts = content.split()
-        if len(parts) == 1:
-            await message.channel.send(
-                f"{message.author.mention} Mention the location (choose one: {', '.join(sorted(PLACES))})."
-            )
-            await bot.process_commands(message)
-            return
-
-        location = None
-        for place in PLACES:
-            if place in content:
-                location = place
-                break
-
-        if not location:
-            await message.channel.send("Invalid location! Options: " + ", ".join(sorted(PLACES)))
-            await bot.process_commands(message)
-            return
-
-        doc_id, err = await create_event(message.author, location, guild_id)
-        if err:
-            await message.channel.send(f"{message.author.mention} {err}")
-        else:
-            await message.channel.send(
-                f"{message.author.mention} Starting event at **{location}**. "
-                f"Calendar created and will keep extending. Event ID: `{doc_id}`"
-            )
-
-    # STOP
-    elif content.startswith("stop"):
-        doc_id, err = await stop_event(message.author, guild_id)
-        if err:
-            await message.channel.send(f"{message.author.mention} {err}")
-        else:
-            scope = "this server" if guild_id is not None else "your latest active session"
-            await message.channel.send(
-                f"{message.author.mention} Stopped {scope} (`{doc_id}`). Final end time recorded on Calendar."
-            )
+@bot.event
+async def on_command_error(ctx, error):
+    # With the bare prefix every chat message is parsed as a possible command
+    if isinstance(error, commands.CommandNotFound):
+        return
+    if ctx.command is not None and ctx.command.has_error_handler():
+        return
+    logging.error(f"Error in command {ctx.command}", exc_info=error)
+
+# ------------- Discord commands -------------
+class Place(commands.Converter):
+    """First known place mentioned in the argument, e.g. 'at the ev' -> 'ev'."""
+    async def convert(self, ctx, argument):
+        m = _PLACE_RE.search(argument.lower())
+        if not m:
+            raise commands.BadArgument(argument)
+        return m.group(1)
+
+@bot.command()
+async def start(ctx, *, location: Place = None):
+    if location is None:
+        await ctx.send(
+            f"{ctx.author.mention} Mention the location (choose one: {_PLACES_PROMPT})."
+        )
+        return
 
-    await bot.process_commands(message)
+    guild_id = ctx.guild.id if ctx.guild else None
+    doc_id, err = await create_event(ctx.author, location, guild_id)
+    if err:
+        await ctx.send(f"{ctx.author.mention} {err}")
+    else:
+        await ctx.send(
+            f"{ctx.author.mention} Starting event at **{location}**. "
+            f"Calendar created and will keep extending. Event ID: `{doc_id}`"
+        )
+
+@start.error
+async def _start_error(ctx, error):
+    if isinstance(error, commands.BadArgument):
+        await ctx.send(_INVALID_PLACE_MSG)
+    else:
+        logging.error("Error in start command", exc_info=error)
+
+@bot.command()
+async def stop(ctx):
+    guild_id = ctx.guild.id if ctx.guild else None
+    doc_id, err = await stop_event(ctx.author, guild_id)
+    if err:
+        await ctx.send(f"{ctx.author.mention} {err}")
+    else:
+        scope = "this server" if guild_id is not None else "your latest active session"
+        await ctx.send(
+            f"{ctx.author.mention} Stopped {scope} (`{doc_id}`). Final end time recorded on Calendar."
+        )
 
 if __name__ == "__main__":
-    bot.run(DISCORD_TOKEN, log_handler=handler, log_level=logging.DEBUG)
+    _log_listener.start()
+    try:
+        # root_logger so our own logging.exception() calls go through the queue too
+        bot.run(DISCORD_TOKEN, log_handler=handler, log_level=logging.INFO, root_logger=True)
+    finally:
+        _log_listener.stop()